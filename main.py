@@ -3,7 +3,8 @@
 import os
 import argparse
 import sys
-from pipeline import TARGET_TABLE_NAMES, ClickHouseClient, Pipeline, read_sql
+from pipeline import TARGET_TABLE_NAMES, Pipeline, get_clickhouse_client
+from reports import KPI_REPORTS, REPORT_FORMATS, run_kpi_reports
 from seed import (
     get_connection,
     create_advertisers,
@@ -84,9 +85,22 @@ def parse_args():
     )
 
     # Show analytics stats command
-    subparsers.add_parser("chstats", help="Show ClickHouse statistics")
+    chstats_parser = subparsers.add_parser("chstats", help="Show ClickHouse statistics")
+    chstats_parser.add_argument(
+        "--format", type=str, choices=REPORT_FORMATS, default="table", help="Output format"
+    )
+    chstats_parser.add_argument(
+        "--output-dir", type=str, help="Write one file per report here instead of stdout"
+    )
+    chstats_parser.add_argument(
+        "--report", type=str, choices=list(KPI_REPORTS), help="Only run this report"
+    )
+
+    args = parser.parse_args()
+    if args.command == "chstats" and args.format == "parquet" and not args.output_dir:
+        parser.error("--format parquet requires --output-dir")
 
-    return parser.parse_args()
+    return args
 
 
 def show_stats(conn):
@@ -151,32 +165,11 @@ def show_stats(conn):
             )
 
 
-def show_clickhouse_stats(ch_client):
+def show_clickhouse_stats(ch_client, fmt="table", output_dir=None, report=None):
     """
     Display ClickHouse statistics: Campaign CTR, Daily Impressions and Clicks, CTR per Advertiser.
     """
-    print("=== 📊 Campaign CTR ===")
-    ctr_result = ch_client.query(read_sql("sql/analytics", "campaign_ctr.sql"))
-    print(f"{'Campaign ID':<12} {'Name':<20} {'Impressions':<12} {'Clicks':<8} {'CTR':<6}")
-    print("-" * 60)
-    for row in ctr_result.result_rows:
-        print(f"{row[0]:<12} {row[1]:<20} {row[2]:<12} {row[3]:<8} {row[4]:.2%}")
-
-    print("\n=== 📅 Daily Impressions and Clicks ===")
-    daily_result = ch_client.query(
-        read_sql("sql/analytics", "daily_metrics.sql"))
-    print(f"{'Date':<12} {'Impressions':<12} {'Clicks':<8} {'CTR':<6}")
-    print("-" * 45)
-    for row in daily_result.result_rows:
-        print(f"{row[0]}   {row[1]:<12} {row[2]:<8} {row[3]:.2%}")
-
-    print("\n=== 📈 CTR per Advertiser ===")
-    advertiser_result = ch_client.query(
-        read_sql("sql/analytics", "advertiser_ctr.sql"))
-    print(f"{'Advertiser ID':<15} {'Name':<20} {'Impressions':<12} {'Clicks':<8} {'CTR':<6}")
-    print("-" * 65)
-    for row in advertiser_result.result_rows:
-        print(f"{row[0]:<15} {row[1]:<20} {row[2]:<12} {row[3]:<8} {row[4]:.2%}")
+    run_kpi_reports(ch_client, fmt, output_dir, [report] if report else None)
 
 
 def reset_data(conn, ch_client):
@@ -210,7 +203,12 @@ def main():
         print("Could not connect to Postgres. Exiting.")
         sys.exit(1)
 
-    ch_client = ClickHouseClient()
+    try:
+        ch_client = get_clickhouse_client()
+    except ValueError as e:
+        print(f"Invalid ClickHouse configuration: {e}")
+        conn.close()
+        sys.exit(1)
     if not ch_client.client:
         print("Could not connect to ClickHouse. Exiting.")
         sys.exit(1)
@@ -270,7 +268,7 @@ def main():
             pipeline.run()
 
         elif args.command == "chstats":
-            show_clickhouse_stats(ch_client)
+            show_clickhouse_stats(ch_client, args.format, args.output_dir, args.report)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -1,5 +1,8 @@
 import os
 import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import clickhouse_connect
 
 # Constants
@@ -10,6 +13,25 @@ TARGET_TABLE_NAMES = BASE_TABLES + ANALYTICS_TABLES
 LAST_SYNC_FILE = "last_synced_ids.json"
 SQL_PATH = "sql/init"
 
+# Sharded target: rows of these tables live on shard `key % number_of_shards`,
+# the same rule the Distributed engine applies to its sharding key. Keying by
+# campaign keeps a campaign's impressions and clicks next to the campaign row.
+SHARD_KEYS = {"campaign": "id", "impressions": "campaign_id", "clicks": "campaign_id"}
+# Small dimension tables are copied to every shard so analytics joins stay local.
+REPLICATED_TABLES = ["advertiser"]
+# Shard batches are separate requests, so a failed sync can leave some shards written.
+# Sharded base tables dedupe a retried batch by id and analytics builds read them with
+# FINAL (the `final` setting skips tables whose engine does not support it).
+SHARDED_ENGINES = {
+    "advertiser": "ReplacingMergeTree(updated_at)",
+    "campaign": "ReplacingMergeTree(updated_at)",
+    "impressions": "ReplacingMergeTree()",
+    "clicks": "ReplacingMergeTree()",
+}
+SHARDED_ANALYTICS_SETTINGS = {"final": 1}
+CLICKHOUSE_CLUSTER = os.getenv("CLICKHOUSE_CLUSTER", "adtech")
+DISTRIBUTED_DB = os.getenv("CLICKHOUSE_DISTRIBUTED_DB", "adtech")
+
 
 def read_sql(path, name):
     with open(os.path.join(path, name), "r") as f:
@@ -17,12 +39,15 @@ def read_sql(path, name):
 
 
 class ClickHouseClient:
-    def __init__(self):
+    def __init__(self, host=None, port=None, database=None):
         self.client = clickhouse_connect.get_client(
-            host=os.getenv("CLICKHOUSE_HOST", "localhost"),
-            port=int(os.getenv("CLICKHOUSE_PORT", 8123)),
+            host=host or os.getenv("CLICKHOUSE_HOST", "localhost"),
+            port=port or int(os.getenv("CLICKHOUSE_PORT", 8123)),
             username=os.getenv("CLICKHOUSE_USER", "default"),
             password=os.getenv("CLICKHOUSE_PASSWORD", "clickhouse"),
+            database=database,
+            # No session: KPI reports run concurrent queries over one client.
+            autogenerate_session_id=False,
         )
 
     def truncate_tables(self, tables):
@@ -34,16 +59,19 @@ class ClickHouseClient:
             except Exception as e:
                 print(f"❌ Could not truncate {table_name}: {e}")
 
-    def create_tables(self):
+    def create_tables(self, engines=None):
+        engines = engines or {}
         for table_name in TARGET_TABLE_NAMES:
             sql = read_sql(SQL_PATH, table_name + ".sql")
+            if table_name in engines:
+                sql = sql.replace("ENGINE = MergeTree()", f"ENGINE = {engines[table_name]}")
             self.client.query(sql)
 
-    def update_analytics(self):
+    def update_analytics(self, settings=None):
         self.truncate_tables(ANALYTICS_TABLES)
         for table_name in ANALYTICS_TABLES:
             sql = read_sql(SQL_PATH, table_name + "_init.sql")
-            self.client.query(sql)
+            self.client.query(sql, settings=settings)
 
     def insert(self, table, rows, column_names):
         self.client.insert(table, rows, column_names=column_names)
@@ -51,12 +79,140 @@ class ClickHouseClient:
     def query(self, query_str):
         return self.client.query(query_str)
 
+    def query_row_block_stream(self, query_str):
+        return self.client.query_row_block_stream(query_str)
+
+    def query_arrow_stream(self, query_str):
+        return self.client.query_arrow_stream(query_str)
+
     def close(self):
         return self.client.close()
 
 
+class ShardedClickHouseClient:
+    """
+    ClickHouse target split across several shards.
+
+    Every shard holds the regular tables locally and `Distributed` tables in
+    DISTRIBUTED_DB on top of them. Inserts bypass the Distributed engine and are
+    routed client-side to the owning shard; KPI queries read the Distributed
+    tables so results are merged across the cluster.
+    """
+
+    def __init__(self, shard_addresses):
+        self.shard_addresses = shard_addresses
+        self.shards = [ClickHouseClient(host, port) for host, port in shard_addresses]
+        self.client = self.shards[0].client
+        self._distributed = None
+        self._distributed_lock = threading.Lock()
+        self._check_cluster()
+
+    def _check_cluster(self):
+        # Client-side routing only matches the Distributed sharding key when both
+        # see the same number of shards.
+        cluster_shards = self.client.command(
+            "SELECT countDistinct(shard_num) FROM system.clusters WHERE cluster = %(cluster)s",
+            parameters={"cluster": CLICKHOUSE_CLUSTER},
+        )
+        if cluster_shards != len(self.shards):
+            self.close()
+            raise ValueError(
+                f"CLICKHOUSE_SHARDS lists {len(self.shards)} shards but cluster "
+                f"'{CLICKHOUSE_CLUSTER}' has {cluster_shards}"
+            )
+
+    def _on_shards(self, func):
+        with ThreadPoolExecutor(max_workers=len(self.shards)) as pool:
+            return list(pool.map(func, self.shards))
+
+    def truncate_tables(self, tables):
+        self._on_shards(lambda shard: shard.truncate_tables(tables))
+
+    def create_tables(self):
+        self._on_shards(self._create_shard_tables)
+
+    def _create_shard_tables(self, shard):
+        shard.create_tables(SHARDED_ENGINES)
+        shard.client.command(f"CREATE DATABASE IF NOT EXISTS {DISTRIBUTED_DB}")
+        for table_name in TARGET_TABLE_NAMES:
+            if table_name in REPLICATED_TABLES:
+                continue
+            sharding_key = f", {SHARD_KEYS[table_name]}" if table_name in SHARD_KEYS else ""
+            shard.client.command(
+                f"CREATE TABLE IF NOT EXISTS {DISTRIBUTED_DB}.{table_name} "
+                f"AS default.{table_name} "
+                f"ENGINE = Distributed({CLICKHOUSE_CLUSTER}, default, {table_name}{sharding_key})"
+            )
+
+    def update_analytics(self):
+        # Every shard aggregates its own campaigns; KPI queries merge the partials.
+        self._on_shards(lambda shard: shard.update_analytics(SHARDED_ANALYTICS_SETTINGS))
+
+    def insert(self, table, rows, column_names):
+        # Retried batches are deduplicated by SHARDED_ENGINES, see above.
+        if table in REPLICATED_TABLES:
+            self._on_shards(lambda shard: shard.insert(table, rows, column_names))
+            return
+
+        key_index = column_names.index(SHARD_KEYS[table])
+        batches = defaultdict(list)
+        for row in rows:
+            batches[row[key_index] % len(self.shards)].append(row)
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            list(
+                pool.map(
+                    lambda item: self.shards[item[0]].insert(table, item[1], column_names),
+                    batches.items(),
+                )
+            )
+
+    def _distributed_client(self):
+        # Created lazily (the database only exists after create_tables) and shared by
+        # the concurrent KPI report threads.
+        with self._distributed_lock:
+            if self._distributed is None:
+                host, port = self.shard_addresses[0]
+                self._distributed = ClickHouseClient(host, port, database=DISTRIBUTED_DB)
+            return self._distributed
+
+    def query(self, query_str):
+        return self._distributed_client().query(query_str)
+
+    def query_row_block_stream(self, query_str):
+        return self._distributed_client().query_row_block_stream(query_str)
+
+    def query_arrow_stream(self, query_str):
+        return self._distributed_client().query_arrow_stream(query_str)
+
+    def close(self):
+        if self._distributed is not None:
+            self._distributed.close()
+        self._on_shards(lambda shard: shard.close())
+
+
+def get_clickhouse_client():
+    """
+    Return a ShardedClickHouseClient when CLICKHOUSE_SHARDS is set
+    (comma-separated host:port list in cluster order), else a single-node client.
+    """
+    shards = os.getenv("CLICKHOUSE_SHARDS")
+    if not shards:
+        return ClickHouseClient()
+
+    addresses = []
+    for address in shards.split(","):
+        host, _, port = address.strip().rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(
+                f"Invalid CLICKHOUSE_SHARDS entry '{address.strip()}', expected host:port"
+            )
+        addresses.append((host, int(port)))
+    return ShardedClickHouseClient(addresses)
+
+
 class Pipeline:
-    def __init__(self, pg_conn, ch_client: ClickHouseClient, mode="full"):
+    def __init__(self, pg_conn, ch_client: ClickHouseClient | ShardedClickHouseClient, mode="full"):
         self.pg_conn = pg_conn
         self.ch_client = ch_client
         self.mode = mode
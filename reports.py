@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import read_sql
+
+ANALYTICS_SQL_PATH = "sql/analytics"
+REPORT_FORMATS = ["table", "csv", "jsonl", "parquet"]
+FILE_EXTENSIONS = {"table": "txt", "csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}
+
+# Report name (sql/analytics/<name>.sql) -> table title and (column, header, width) per
+# query column. The last column of every report is the CTR, printed as a percentage.
+KPI_REPORTS = {
+    "campaign_ctr": (
+        "=== 📊 Campaign CTR ===",
+        [
+            ("campaign_id", "Campaign ID", 12),
+            ("campaign_name", "Name", 20),
+            ("impressions", "Impressions", 12),
+            ("clicks", "Clicks", 8),
+            ("ctr", "CTR", 6),
+        ],
+    ),
+    "daily_metrics": (
+        "=== 📅 Daily Impressions and Clicks ===",
+        [
+            ("day", "Date", 12),
+            ("impressions", "Impressions", 12),
+            ("clicks", "Clicks", 8),
+            ("ctr", "CTR", 6),
+        ],
+    ),
+    "advertiser_ctr": (
+        "=== 📈 CTR per Advertiser ===",
+        [
+            ("advertiser_id", "Advertiser ID", 15),
+            ("advertiser_name", "Name", 20),
+            ("impressions", "Impressions", 12),
+            ("clicks", "Clicks", 8),
+            ("ctr", "CTR", 6),
+        ],
+    ),
+}
+
+
+def write_table(report, stream, out):
+    title, columns = KPI_REPORTS[report]
+    out.write(title + "\n")
+    out.write(" ".join(f"{header:<{width}}" for _, header, width in columns) + "\n")
+    out.write("-" * (sum(width for _, _, width in columns) + len(columns) - 1) + "\n")
+    for block in stream:
+        lines = []
+        for *values, ctr in block:
+            cells = [f"{value!s:<{width}}" for value, (_, _, width) in zip(values, columns)]
+            lines.append(" ".join(cells) + f" {ctr:.2%}\n")
+        out.writelines(lines)
+
+
+def write_csv(report, stream, out):
+    # Empty results carry no column metadata, so the header comes from KPI_REPORTS.
+    writer = csv.writer(out)
+    writer.writerow([column for column, _, _ in KPI_REPORTS[report][1]])
+    for block in stream:
+        writer.writerows(block)
+
+
+def write_jsonl(report, stream, out):
+    column_names = stream.source.column_names
+    for block in stream:
+        out.writelines(
+            json.dumps(dict(zip(column_names, row)), default=str) + "\n" for row in block
+        )
+
+
+def write_parquet(report, stream, out):
+    import pyarrow.parquet as pq
+
+    # The Arrow stream reader knows the schema before the first batch, so an empty
+    # result still produces a valid (zero-row) file.
+    with pq.ParquetWriter(out, stream.gen.schema) as writer:
+        for batch in stream:
+            writer.write_batch(batch)
+
+
+WRITERS = {"table": write_table, "csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def open_report_stream(ch_client, report, fmt):
+    """Send the report query and return its block stream (Arrow batches for parquet)."""
+    sql = read_sql(ANALYTICS_SQL_PATH, report + ".sql")
+    if fmt == "parquet":
+        return ch_client.query_arrow_stream(sql)
+    return ch_client.query_row_block_stream(sql)
+
+
+def export_report(ch_client, report, fmt, output_dir):
+    path = os.path.join(output_dir, f"{report}.{FILE_EXTENSIONS[fmt]}")
+    file_args = {"mode": "wb"} if fmt == "parquet" else {"mode": "w", "newline": ""}
+    with open_report_stream(ch_client, report, fmt) as stream, open(path, **file_args) as out:
+        WRITERS[fmt](report, stream, out)
+    print(f"✅ Wrote {path}")
+
+
+def run_kpi_reports(ch_client, fmt="table", output_dir=None, reports=None):
+    """
+    Run the KPI reports (all by default) and write them block by block, so memory
+    stays bounded by the stream block size rather than the report size.
+
+    With output_dir every report streams into its own file in parallel. On stdout
+    the reports run one after another: a stream opened early would sit unread
+    behind the previous report and could hit the server's send timeout.
+    """
+    reports = reports or list(KPI_REPORTS)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(reports)) as pool:
+            list(
+                pool.map(lambda report: export_report(ch_client, report, fmt, output_dir), reports)
+            )
+        return
+
+    for i, report in enumerate(reports):
+        with open_report_stream(ch_client, report, fmt) as stream:
+            if i and fmt != "jsonl":
+                sys.stdout.write("\n")
+            WRITERS[fmt](report, stream, sys.stdout)
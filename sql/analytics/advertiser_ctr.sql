@@ -1,9 +1,10 @@
 SELECT
     advertiser_id,
     advertiser_name,
-    impressions,
-    clicks,
+    sum(impressions) AS impressions,
+    sum(clicks) AS clicks,
     if(impressions > 0, least(1.0, clicks / impressions), 0.0) AS ctr
 FROM advertiser_stats
-WHERE impressions > 0
+GROUP BY advertiser_id, advertiser_name
+HAVING impressions > 0
 ORDER BY ctr DESC;
\ No newline at end of file
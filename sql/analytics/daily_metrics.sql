@@ -1,7 +1,8 @@
 SELECT
     day,
-    impressions,
-    clicks,
+    sum(impressions) AS impressions,
+    sum(clicks) AS clicks,
     if(impressions > 0, least(1.0, clicks / impressions), 0.0) AS ctr
 FROM daily_stats
+GROUP BY day
 ORDER BY day;
\ No newline at end of file
@@ -2,8 +2,8 @@ INSERT INTO campaign_stats
 SELECT
     c.id AS campaign_id,
     c.name AS campaign_name,
-    countDistinct(i.id) AS impressions,
-    countDistinct(cl.id) AS clicks
+    countDistinctIf(i.id, i.id != 0) AS impressions,
+    countDistinctIf(cl.id, cl.id != 0) AS clicks
 FROM campaign c
 LEFT JOIN impressions i ON c.id = i.campaign_id
 LEFT JOIN clicks cl ON c.id = cl.campaign_id